@@ -2,41 +2,69 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import models, database
-import firebase_admin
-from firebase_admin import auth, credentials
 import os
-
 import json
+import threading
+
+# firebase_admin is imported lazily: it is slow to import and only needed once
+# the first token has to be verified (or when main.py warms it up at startup).
+_firebase_lock = threading.Lock()
+_firebase_auth = None
+
+def init_firebase():
+    """Initialize Firebase Admin once per process and return its auth module."""
+    global _firebase_auth
+    if _firebase_auth is not None:
+        return _firebase_auth
+    with _firebase_lock:
+        if _firebase_auth is not None:
+            return _firebase_auth
+        import firebase_admin
+        from firebase_admin import auth, credentials
+
+        # Check if app is already initialized to avoid errors on reload
+        if not firebase_admin._apps:
+            cred_path = "serviceAccountKey.json"
+            if os.path.exists(cred_path):
+                cred = credentials.Certificate(cred_path)
+            else:
+                # Fallback to environment variable for production
+                cred_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
+                if cred_json:
+                    try:
+                        cred_dict = json.loads(cred_json)
+                        cred = credentials.Certificate(cred_dict)
+                    except json.JSONDecodeError:
+                         print("ERROR: Invalid JSON in FIREBASE_CREDENTIALS_JSON")
+                         cred = None
+                else:
+                    print("WARNING: No Firebase credentials found (file or env var). Auth will fail.")
+                    cred = None
+
+            if cred:
+                firebase_admin.initialize_app(cred)
 
-# Initialize Firebase Admin
-# Check if app is already initialized to avoid errors on reload
-if not firebase_admin._apps:
-    cred_path = "serviceAccountKey.json"
-    if os.path.exists(cred_path):
-        cred = credentials.Certificate(cred_path)
-    else:
-        # Fallback to environment variable for production
-        cred_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
-        if cred_json:
-            try:
-                cred_dict = json.loads(cred_json)
-                cred = credentials.Certificate(cred_dict)
-            except json.JSONDecodeError:
-                 print("ERROR: Invalid JSON in FIREBASE_CREDENTIALS_JSON")
-                 cred = None
-        else:
-            print("WARNING: No Firebase credentials found (file or env var). Auth will fail.")
-            cred = None
-
-    if cred:
-        firebase_admin.initialize_app(cred)
+        _firebase_auth = auth
+    return _firebase_auth
 
 security = HTTPBearer()
 
+# ADMIN_EMAILS: comma separated list of emails allowed to use admin-only
+# endpoints (e.g. profiling). Read on each check so a .env loaded after this
+# module is imported still applies.
+def admin_emails():
+    return {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+def verify_token(token):
+    return init_firebase().verify_id_token(token)
+
+def is_admin(email):
+    return bool(email) and email.lower() in admin_emails()
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(database.get_db)):
     token = credentials.credentials
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = verify_token(token)
         uid = decoded_token['uid']
         email = decoded_token.get('email')
     except Exception as e:
@@ -55,3 +83,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         db.refresh(user)
     
     return user
+
+def get_current_admin(current_user: models.User = Depends(get_current_user)):
+    if not is_admin(current_user.email):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
@@ -0,0 +1,147 @@
+import json
+import random
+import re
+import time
+
+import models
+
+BENCH_UID = "bench-user"
+BENCH_EMAIL = "bench@example.com"
+
+# Approximate length of content_text per section for each size label
+CONTENT_LENGTHS = {
+    "short": 200,
+    "medium": 2000,
+    "long": 20000,
+}
+
+WORDS = (
+    "market strategy growth revenue customer platform model data team product "
+    "quarter analysis risk cost launch pipeline insight adoption roadmap metric"
+).split()
+
+
+def fake_verify_token(token):
+    """Stand-in for Firebase token verification so benchmarks never hit the network."""
+    return {"uid": BENCH_UID, "email": BENCH_EMAIL}
+
+
+def synthetic_text(rng, length):
+    """Markdown-ish text mixing headings, bullets, bold runs and long paragraphs."""
+    lines = []
+    total = 0
+    while total < length:
+        kind = rng.random()
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 40))]
+        if rng.random() < 0.3:
+            i = rng.randrange(len(words))
+            words[i] = f"**{words[i]}**"
+        if kind < 0.1:
+            line = "## " + " ".join(words[:5]).title()
+        elif kind < 0.5:
+            line = "* " + " ".join(words)
+        else:
+            line = " ".join(words).capitalize() + "."
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def seed_user(db):
+    user = db.query(models.User).filter(models.User.firebase_uid == BENCH_UID).first()
+    if not user:
+        user = models.User(email=BENCH_EMAIL, firebase_uid=BENCH_UID)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+
+def seed_project(db, user, num_sections, length_label, doc_type="docx", seed=0):
+    """Create a project with `num_sections` sections of synthetic content."""
+    rng = random.Random(seed)
+    length = CONTENT_LENGTHS[length_label]
+    project = models.Project(
+        user_id=user.id,
+        title=f"Bench {doc_type} {num_sections}x{length_label}",
+        doc_type=doc_type,
+    )
+    db.add(project)
+    db.flush()
+    db.bulk_insert_mappings(models.Content, [
+        {
+            "project_id": project.id,
+            "section_order": i,
+            "title": f"Section {i + 1}",
+            "content_text": synthetic_text(rng, length),
+            "metadata_props": {},
+        }
+        for i in range(num_sections)
+    ])
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+class FakeUsage:
+    def __init__(self, prompt, text):
+        # Roughly 4 characters per token, like the Gemini tokenizer on English
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeStreamResponse:
+    """Iterable of chunks, resolved like a streamed genai response."""
+
+    def __init__(self, chunks, usage_metadata, latency):
+        self._chunks = chunks
+        self._latency = latency
+        self.usage_metadata = usage_metadata
+
+    def __iter__(self):
+        delay = self._latency / max(len(self._chunks), 1)
+        for chunk in self._chunks:
+            time.sleep(delay)
+            yield FakeResponse(chunk)
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+
+class FakeModel:
+    """Mimics genai.GenerativeModel.generate_content with a fixed latency."""
+
+    def __init__(self, latency=0.05, section_length=800, seed=0):
+        self.latency = latency
+        self.section_length = section_length
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def _reply(self, prompt):
+        if "JSON array" in prompt:
+            match = re.search(r"exactly (\d+) items", prompt)
+            count = int(match.group(1)) if match else 8
+            titles = [f"Generated Section {i + 1}" for i in range(count)]
+            if "JSON array of objects" in prompt:
+                # Whole-document mode: titles and bodies in one response
+                return json.dumps([{"title": t, "content": synthetic_text(self.rng, self.section_length)} for t in titles])
+            return json.dumps(titles)
+        return synthetic_text(self.rng, self.section_length)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        text = self._reply(prompt)
+        usage = FakeUsage(prompt, text)
+        if stream:
+            chunks = [text[i:i + 64] for i in range(0, len(text), 64)]
+            return FakeStreamResponse(chunks, usage, self.latency)
+        time.sleep(self.latency)
+        return FakeResponse(text, usage)
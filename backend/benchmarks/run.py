@@ -0,0 +1,241 @@
+"""Benchmark suite for the export, generation and API hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --quick
+
+Everything runs against a throwaway SQLite database (override with
+BENCH_DATABASE_URL), a stubbed Firebase token check and a fake Gemini model
+with injected latency, so results only depend on this code base.
+Requires httpx (for FastAPI's TestClient) on top of requirements.txt.
+Results are printed (or written) as JSON so runs can be diffed between releases.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Must happen before the app modules read their configuration
+_tmpdir = tempfile.mkdtemp(prefix="aidoc-bench-")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ["GEMINI_API_KEY"] = ""
+# Keep the SDK warm-up thread from replacing the fake model
+os.environ["PRELOAD_SDKS"] = "0"
+
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+import auth, database, models
+from benchmarks import fixtures
+
+auth.verify_token = fixtures.fake_verify_token
+
+from main import app
+from routers import export, generation
+
+HEADERS = {"Authorization": "Bearer bench-token"}
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0] * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def run_export(db, user, sizes, lengths, repeat):
+    results = []
+    for doc_type, export_fn in (("docx", export.export_docx), ("pptx", export.export_pptx)):
+        for num_sections in sizes:
+            for length in lengths:
+                project = fixtures.seed_project(db, user, num_sections, length, doc_type=doc_type)
+                contents = sorted(project.contents, key=lambda c: c.section_order)
+                chars = sum(len(c.content_text) for c in contents)
+
+                def build():
+                    response = export_fn(project, contents)
+                    size = os.path.getsize(response.path)
+                    os.remove(response.path)
+                    return size
+
+                samples, file_size = timed(build, repeat)
+                peak, _ = peak_memory(build)
+                stats = summarize(samples)
+                results.append({
+                    "doc_type": doc_type,
+                    "sections": num_sections,
+                    "content_length": length,
+                    "content_chars": chars,
+                    "file_bytes": file_size,
+                    "peak_memory_bytes": peak,
+                    "sections_per_sec": round(num_sections / statistics.median(samples), 1),
+                    **stats,
+                })
+                print(f"export {doc_type} {num_sections}x{length}: {stats['median_ms']}ms", file=sys.stderr)
+    return results
+
+
+def run_auth(db, repeat):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="bench-token")
+    samples, _ = timed(lambda: auth.get_current_user(credentials, db), repeat)
+    return summarize(samples)
+
+
+def run_api(client, db, user, sizes, lengths, repeat):
+    results = {"read_project": []}
+    for num_sections in sizes:
+        for length in lengths:
+            project = fixtures.seed_project(db, user, num_sections, length)
+            samples, response = timed(lambda: client.get(f"/projects/{project.id}", headers=HEADERS), repeat)
+            response.raise_for_status()
+            conditional = {**HEADERS, "If-None-Match": response.headers["ETag"]}
+            not_modified, _ = timed(lambda: client.get(f"/projects/{project.id}", headers=conditional), repeat)
+            results["read_project"].append({
+                "sections": num_sections,
+                "content_length": length,
+                "response_bytes": len(response.content),
+                **summarize(samples),
+                "not_modified": summarize(not_modified),
+            })
+    project_count = db.query(models.Project).filter(models.Project.user_id == user.id).count()
+    samples, response = timed(lambda: client.get("/projects/", headers=HEADERS), repeat)
+    response.raise_for_status()
+    results["list_projects"] = {
+        "projects": project_count,
+        "response_bytes": len(response.content),
+        **summarize(samples),
+    }
+    return results
+
+
+def run_generation(client, sizes, latency):
+    results = []
+    for num_sections in sizes:
+        fake = fixtures.FakeModel(latency=latency)
+        generation.model = fake
+        project = client.post("/projects/", json={"title": "Bench generation", "doc_type": "docx"}, headers=HEADERS).json()
+
+        start = time.perf_counter()
+        response = client.post(
+            "/generate/outline",
+            json={"project_id": project["id"], "topic": "Benchmarking", "num_slides": num_sections},
+            headers=HEADERS,
+        )
+        response.raise_for_status()
+        outline_time = time.perf_counter() - start
+        for section in response.json():
+            client.post(
+                f"/generate/content?project_id={project['id']}&content_id={section['id']}",
+                headers=HEADERS,
+            ).raise_for_status()
+        total = time.perf_counter() - start
+        results.append({
+            "sections": num_sections,
+            "model_latency_ms": latency * 1000,
+            "model_calls": fake.calls,
+            "outline_ms": round(outline_time * 1000, 3),
+            "total_ms": round(total * 1000, 3),
+            "overhead_ms": round((total - fake.calls * latency) * 1000, 3),
+        })
+        print(f"generation {num_sections} sections: {results[-1]['total_ms']}ms", file=sys.stderr)
+
+        # Same document through the single-call structured mode
+        fake = fixtures.FakeModel(latency=latency)
+        generation.model = fake
+        project = client.post("/projects/", json={"title": "Bench document", "doc_type": "docx"}, headers=HEADERS).json()
+        start = time.perf_counter()
+        client.post(
+            "/generate/document",
+            json={"project_id": project["id"], "topic": "Benchmarking", "num_slides": num_sections},
+            headers=HEADERS,
+        ).raise_for_status()
+        total = time.perf_counter() - start
+        results[-1]["single_call"] = {
+            "model_calls": fake.calls,
+            "total_ms": round(total * 1000, 3),
+            "overhead_ms": round((total - fake.calls * latency) * 1000, 3),
+        }
+    return results
+
+
+def parse_sizes(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--sizes", type=parse_sizes, default=[10, 100, 1000], help="section counts, comma separated")
+    parser.add_argument("--lengths", default="short,medium,long", help=f"content lengths ({', '.join(fixtures.CONTENT_LENGTHS)})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gen-sizes", type=parse_sizes, default=[10, 50], help="section counts for generation runs")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--quick", action="store_true", help="small sizes, for smoke runs")
+    args = parser.parse_args(argv)
+
+    lengths = [l for l in args.lengths.split(",") if l]
+    if args.quick:
+        args.sizes, lengths, args.repeat, args.gen_sizes = [10], ["short"], 2, [5]
+
+    db = database.SessionLocal()
+    try:
+        # Entering the client runs the lifespan hook, which creates the tables
+        with TestClient(app) as client:
+            user = fixtures.seed_user(db)
+            results = {
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "database": database.engine.url.get_backend_name(),
+                    "repeat": args.repeat,
+                },
+                "export": run_export(db, user, args.sizes, lengths, args.repeat),
+                "get_current_user": run_auth(db, max(args.repeat, 100)),
+                "api": run_api(client, db, user, args.sizes, lengths, args.repeat),
+                "generation": run_generation(client, args.gen_sizes, args.model_latency),
+            }
+    finally:
+        db.close()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
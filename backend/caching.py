@@ -0,0 +1,81 @@
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from starlette.middleware.gzip import GZipMiddleware
+
+import models
+
+# Browsers revalidate on every use but can reuse the cached body on a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def touch_project(db: Session, project_id: int):
+    """Bump a project's revision in the current transaction and return it.
+
+    Must be called by every write path that changes a project or its contents,
+    otherwise clients holding the old ETag keep getting 304s.
+    """
+    return db.execute(
+        update(models.Project)
+        .where(models.Project.id == project_id)
+        .values(revision=models.Project.revision + 1, updated_at=func.now())
+        .returning(models.Project.revision)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def project_etag(project_id: int, revision: int) -> str:
+    return f'W/"p{project_id}-r{revision}"'
+
+
+def project_list_etag(revisions) -> str:
+    """ETag for a page of projects, from its (id, revision) pairs."""
+    digest = hashlib.sha1(repr(list(revisions)).encode()).hexdigest()[:20]
+    return f'W/"l{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(tag) == wanted for tag in header.split(","))
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_cache_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+class JSONGZipMiddleware:
+    """GZip large API responses, leaving exported documents alone.
+
+    .docx/.pptx files are already zip archives, so compressing them again
+    only burns CPU.
+    """
+
+    def __init__(self, app, minimum_size=1024, exclude_prefixes=("/export",)):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -23,3 +23,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every worker's startup
+SCHEMA_LOCK_KEY = 804317
+
+def _missing_columns(conn, if_not_exists=""):
+    """(table, column, DDL) for every model column missing from an existing table."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}{column.name} {column.type.compile(conn.dialect)}"
+            if column.server_default is not None and isinstance(column.server_default.arg, str):
+                ddl += f" DEFAULT {column.server_default.arg}"
+            missing.append((table.name, column.name, ddl))
+    return missing
+
+def add_missing_columns(bind=engine):
+    """create_all() never alters existing tables, so add columns introduced
+    after a table was first created. Only plain, nullable or server-defaulted
+    columns are supported; anything more involved needs a real migration.
+
+    Every worker runs this at startup. On Postgres an advisory lock serializes
+    them and ADD COLUMN IF NOT EXISTS makes the late ones no-ops; elsewhere a
+    failed ALTER is ignored when another worker has added the column already.
+    """
+    if bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            for _, _, ddl in _missing_columns(conn, if_not_exists="IF NOT EXISTS "):
+                conn.execute(text(ddl))
+        return
+
+    with bind.connect() as conn:
+        missing = _missing_columns(conn)
+    for table_name, column_name, ddl in missing:
+        try:
+            with bind.begin() as conn:
+                conn.execute(text(ddl))
+        except Exception:
+            # Lost the race to another worker starting at the same time
+            if column_name not in {c["name"] for c in inspect(bind).get_columns(table_name)}:
+                raise
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import select
+import threading
+
+import schemas
+
+# Project change feed.
+# Write paths publish small events after they commit, e.g.
+#   {"type": "section_text_updated", "project_id": 1, "revision": 7, "content_id": 3, "content_text": "..."}
+# and every WebSocket subscribed to that project (routers/projects.py) receives them.
+#
+# With a single worker events are dispatched in-process. With several workers
+# set CHANGE_FEED_BROKER=postgres to relay them through Postgres LISTEN/NOTIFY
+# on the application database, so every worker sees every event.
+CHANGE_FEED_BROKER = os.getenv("CHANGE_FEED_BROKER", "local")
+CHANNEL = "project_changes"
+QUEUE_SIZE = 1000
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+
+
+def section_data(content):
+    """JSON-ready representation of a Content row, as served by the project API."""
+    return schemas.Content.model_validate(content).model_dump(mode="json")
+
+
+class Subscription:
+    def __init__(self, project_id, loop):
+        self.project_id = project_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, event):
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            # Slow consumer: drop the backlog and tell the client to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"type": "resync", "project_id": self.project_id}
+        self.queue.put_nowait(event)
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # project_id -> set of Subscription
+        self._broker = None
+
+    def subscribe(self, project_id):
+        """Register the calling coroutine's loop for events on `project_id`."""
+        subscription = Subscription(project_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.project_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.project_id]
+
+    def publish(self, project_id, event_type, revision=None, **data):
+        """Publish an event. Safe to call from sync handlers running in the threadpool."""
+        event = {"type": event_type, "project_id": project_id, "revision": revision, **data}
+        if self._broker is None:
+            self.dispatch(event)
+            return
+        try:
+            self._broker.send(event)
+        except Exception as e:
+            # The write already committed; clients catch up on their next refetch
+            print(f"ERROR: Failed to publish change event: {e}")
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event["project_id"], ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Loop already closed; the WebSocket is gone
+                self.unsubscribe(subscription)
+
+    def start(self, engine):
+        if CHANGE_FEED_BROKER == "postgres" and self._broker is None:
+            self._broker = PostgresBroker(engine, self.dispatch)
+            self._broker.start()
+
+    def stop(self):
+        if self._broker is not None:
+            self._broker.stop()
+            self._broker = None
+
+
+class PostgresBroker:
+    """Relays events between workers with LISTEN/NOTIFY."""
+
+    def __init__(self, engine, dispatch):
+        self.engine = engine
+        self.dispatch = dispatch
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._listen, name="change-feed-listener", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def send(self, event):
+        payload = json.dumps(event, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            # Too big to relay (long section text): send the event without its
+            # payload fields and let clients refetch the project
+            event = {key: event[key] for key in ("type", "project_id", "revision")}
+            event["truncated"] = True
+            payload = json.dumps(event)
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _listen(self):
+        # A dedicated connection outside the pool, since it stays in LISTEN mode
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self.engine.dialect.connect(*cargs, **cparams)
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {CHANNEL}")
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except Exception as e:
+                print(f"ERROR: Change feed listener failed, reconnecting: {e}")
+                self._stop.wait(1.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+feed = ChangeFeed()
@@ -0,0 +1,118 @@
+import json
+
+
+class JSONArrayStream:
+    """Incrementally extracts the elements of a top-level JSON array.
+
+    Feed it text chunks as they arrive from a streamed model response; each
+    call to feed() returns the elements that were completed by that chunk.
+    Anything before the opening '[' (code fences, stray prose) is ignored.
+
+        stream = JSONArrayStream()
+        for chunk in response:
+            for item in stream.feed(chunk.text):
+                ...
+        items = stream.close()
+
+    With strict=False, elements that are not valid JSON are salvaged where
+    possible (a leading valid value, or bare text as a string) and skipped
+    otherwise; `errors` counts every malformed element, salvaged or not, since
+    a salvage may have dropped data. close() also returns the last element of
+    an array that was cut off before its closing ']'.
+    """
+
+    def __init__(self, strict=True):
+        self.strict = strict
+        self.errors = 0
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start = None
+        self.done = False
+
+    def feed(self, chunk):
+        items = []
+        if self.done or not chunk:
+            return items
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = self._pos
+
+        if not self._started:
+            start = buffer.find("[", pos)
+            if start == -1:
+                self._buffer, self._pos = "", 0
+                return items
+            self._started = True
+            pos = start + 1
+
+        while pos < len(buffer):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                if self._element_start is None:
+                    self._element_start = pos
+            elif char in "[{":
+                self._depth += 1
+                if self._element_start is None:
+                    self._element_start = pos
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+            elif char in ",]" and self._depth == 0:
+                if self._element_start is not None:
+                    self._decode(buffer[self._element_start:pos], items)
+                    self._element_start = None
+                if char == "]":
+                    self.done = True
+                    pos += 1
+                    break
+            elif not char.isspace() and self._element_start is None:
+                self._element_start = pos
+            pos += 1
+
+        # Drop consumed text so long responses don't pile up in memory
+        keep_from = self._element_start if self._element_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return items
+
+    def close(self):
+        """Finish the stream, returning a trailing element left unterminated."""
+        items = []
+        if self._started and not self.done and self._element_start is not None:
+            self._decode(self._buffer[self._element_start:], items, partial=True)
+        self._element_start = None
+        self.done = True
+        return items
+
+    def _decode(self, text, items, partial=False):
+        try:
+            items.append(json.loads(text))
+            return
+        except ValueError:
+            if self.strict and not partial:
+                raise
+        self.errors += 1
+        text = text.strip()
+        try:
+            # A valid value followed by a stray token, e.g. '"Intro" x'
+            value, _ = json.JSONDecoder().raw_decode(text)
+            items.append(value)
+            return
+        except ValueError:
+            pass
+        if text and not partial and not any(c in text for c in '"[]{}'):
+            # Bare, unquoted text such as [Introduction, "Scope"]
+            items.append(text)
@@ -1,12 +1,64 @@
+import time
+_import_started = time.perf_counter()
+
+import os
+import threading
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+# Load .env before any module reads its configuration
+load_dotenv()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import auth, projects, generation, export
+from database import engine, Base, add_missing_columns
+from routers import auth, projects, generation, export, profiling as profiling_router, usage as usage_router
+from profiling import ProfilingMiddleware, ProfiledRoute
+from caching import JSONGZipMiddleware
+import auth as auth_utils
+import usage
+import events
+
+_import_time = time.perf_counter() - _import_started
+
+# Heavy SDKs (firebase_admin, google.generativeai) are loaded on first use.
+# With PRELOAD_SDKS enabled (default) they are warmed up in a background thread
+# after startup, so workers accept requests immediately.
+PRELOAD_SDKS = os.getenv("PRELOAD_SDKS", "1") == "1"
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+startup_report = {}
 
-app = FastAPI(title="AI Document Generator API")
+def _warm_up():
+    for name, init in (("firebase", auth_utils.init_firebase), ("gemini", generation.init_model)):
+        started = time.perf_counter()
+        try:
+            init()
+        except Exception as e:
+            print(f"WARN: {name} warm-up failed: {e}")
+        startup_report[f"{name}_warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    startup_report["import_ms"] = round(_import_time * 1000, 1)
+    startup_report["lifespan_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"INFO: Startup took {startup_report['import_ms']}ms (imports) + {startup_report['lifespan_ms']}ms (lifespan)")
+    if PRELOAD_SDKS:
+        threading.Thread(target=_warm_up, name="sdk-warm-up", daemon=True).start()
+    # Batched writes of LLM token usage; the last batch is flushed on shutdown
+    usage.meter.start()
+    # Cross-worker relay for the project change feed (CHANGE_FEED_BROKER=postgres)
+    events.feed.start(engine)
+    yield
+    events.feed.stop()
+    usage.meter.stop()
+
+app = FastAPI(title="AI Document Generator API", lifespan=lifespan)
+# Routers opt in with route_class=ProfiledRoute; same for the app's own routes
+app.router.route_class = ProfiledRoute
 
 # CORS
 app.add_middleware(
@@ -15,14 +67,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "X-Profile-Id", "ETag", "X-Outline-Partial", "X-Document-Partial"],
 )
 
+# Compress large JSON payloads (full projects, project lists)
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024)
+
+# Opt-in per-request profiling (X-Profile header for admins, or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(generation.router)
 app.include_router(export.router)
+app.include_router(profiling_router.router)
+app.include_router(usage_router.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to AI Document Generator API"}
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "startup": startup_report}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Date, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -20,6 +20,9 @@ class Project(Base):
     title = Column(String, index=True)
     doc_type = Column(String) # "docx" or "pptx"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped on every write to the project or its contents (see caching.touch_project)
+    revision = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
 
     owner = relationship("User", back_populates="projects")
     contents = relationship("Content", back_populates="project", cascade="all, delete-orphan")
@@ -50,3 +53,16 @@ class RefinementHistory(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
     content = relationship("Content", back_populates="refinements")
+
+class LLMUsage(Base):
+    # Append-only: each periodic flush writes one row per user and day with the
+    # tokens used since the previous flush. Daily totals are the SUM of rows.
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    day = Column(Date, index=True)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    calls = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+import auth
+
+# Opt-in request profiling.
+# A request is profiled when either:
+#   - it carries "X-Profile: 1" and a bearer token belonging to an admin, or
+#   - it is picked by PROFILE_SAMPLE_RATE (0.0 - 1.0, operator controlled).
+# Profiles are written in collapsed-stack format ("a;b;c 12"), which
+# speedscope.app and flamegraph.pl both open directly.
+PROFILE_HEADER = b"x-profile"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "aidoc-profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+PROFILE_SUFFIX = ".collapsed"
+
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Profiler of the request being handled, if any. Context variables are copied
+# into the threadpool, so the endpoint wrapper below sees the middleware's value.
+_current_profiler = contextvars.ContextVar("current_profiler", default=None)
+
+
+class SamplingProfiler:
+    """Periodically snapshots the Python stacks of the threads running the handler.
+
+    FastAPI runs sync endpoints in a threadpool, so the handler does not run
+    on the thread that started the profile. Endpoints of ProfiledRoute attach
+    the worker thread for the duration of the call, so concurrent requests on
+    other threads are never sampled.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._thread_ids = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def attach(self, thread_id):
+        self._thread_ids.add(thread_id)
+
+    def detach(self, thread_id):
+        self._thread_ids.discard(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            thread_ids = list(self._thread_ids)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+
+    def collapsed(self, endpoint=None):
+        """Return the samples as collapsed stacks, rooted at `endpoint` if given."""
+        target = getattr(inspect.unwrap(endpoint), "__code__", None) if endpoint else None
+        lines = []
+        for stack, count in self.samples.items():
+            if target is not None:
+                if target not in stack:
+                    continue
+                stack = stack[stack.index(target):]
+            frames = ";".join(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})" for code in stack)
+            lines.append(f"{frames} {count}")
+        lines.sort()
+        return "\n".join(lines) + "\n"
+
+
+def _profiled(call):
+    """Wrap an endpoint so the thread running it is attached to the active profiler."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            profiler = _current_profiler.get()
+            if profiler is None:
+                return await call(*args, **kwargs)
+            thread_id = threading.get_ident()
+            profiler.attach(thread_id)
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profiler.detach(thread_id)
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profiler = _current_profiler.get()
+        if profiler is None:
+            return call(*args, **kwargs)
+        thread_id = threading.get_ident()
+        profiler.attach(thread_id)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.detach(thread_id)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class for routers whose endpoints can be profiled.
+
+    Use as APIRouter(route_class=ProfiledRoute); the endpoint is wrapped so
+    that the thread running it is sampled while a profile is active.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if not getattr(endpoint, "_profiled", False):
+            endpoint = _profiled(endpoint)
+            endpoint._profiled = True
+        super().__init__(path, endpoint, **kwargs)
+
+
+def profile_path(profile_id):
+    if not _PROFILE_ID_RE.match(profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, profile_id + PROFILE_SUFFIX)
+
+
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            profiles.append((os.path.getmtime(path), path))
+        except OSError:
+            # Pruned by a concurrent save_profile()
+            continue
+    return [path for _, path in sorted(profiles, reverse=True)]
+
+
+def save_profile(profile_id, method, path, duration, text):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w") as f:
+        f.write(f"# {method} {path} {duration * 1000:.1f}ms\n")
+        f.write(text)
+    for old in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def _header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _is_admin_request(scope):
+    authorization = _header(scope, b"authorization") or ""
+    if not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        decoded_token = await run_in_threadpool(auth.verify_token, authorization[7:])
+    except Exception:
+        return False
+    return auth.is_admin(decoded_token.get("email"))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests.
+
+    Requests that are not selected only pay for a header scan and, when a
+    sample rate is configured, one random() call.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def _should_profile(self, scope):
+        if scope["type"] != "http":
+            return False
+        if _header(scope, PROFILE_HEADER) == "1":
+            return await _is_admin_request(scope)
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if not await self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler()
+        token = _current_profiler.set(profiler)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _current_profiler.reset(token)
+            await run_in_threadpool(profiler.stop)
+            duration = time.perf_counter() - started
+            text = profiler.collapsed(scope.get("endpoint"))
+            await run_in_threadpool(save_profile, profile_id, scope["method"], scope["path"], duration, text)
@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-import models, schemas, database, auth
+import models, schemas, database, auth, profiling
 import os
-from docx import Document
-from pptx import Presentation
 import tempfile
+import textwrap
+
+# python-docx and python-pptx are imported inside the exporters so that
+# starting the API does not pay for them until the first export.
 
 router = APIRouter(
     prefix="/export",
     tags=["export"],
+    route_class=profiling.ProfiledRoute,
 )
 
 @router.get("/{project_id}")
@@ -27,12 +30,10 @@ def export_document(project_id: int, db: Session = Depends(database.get_db), cur
     else:
         raise HTTPException(status_code=400, detail="Invalid document type")
 
-from pptx.util import Pt
-from pptx.enum.text import MSO_AUTO_SIZE
-
-# ... imports ...
-
 def export_docx(project, contents):
+    from docx import Document
+    from docx.shared import Pt
+
     doc = Document()
     style = doc.styles['Normal']
     font = style.font
@@ -82,21 +83,8 @@ def add_formatted_text(paragraph, text):
             run.bold = True
 
 def export_pptx(project, contents):
-    prs = Presentation()
-    
-    # Title Slide
-    slide_layout = prs.slide_layouts[0] 
-    slide = prs.slides.add_slide(slide_layout)
-    title = slide.shapes.title
-    subtitle = slide.placeholders[1]
-    title.text = project.title
-    subtitle.text = "Generated by AI Document Generator"
-    
-import textwrap
-
-# ... (keep existing imports)
+    from pptx import Presentation
 
-def export_pptx(project, contents):
     prs = Presentation()
     
     # Title Slide
@@ -168,6 +156,9 @@ def export_pptx(project, contents):
     return FileResponse(path, filename=f"{project.title}.pptx", media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation")
 
 def create_slide(prs, title_text, lines):
+    from pptx.util import Pt
+    from pptx.enum.text import MSO_AUTO_SIZE
+
     slide_layout = prs.slide_layouts[1] # Title and Content
     slide = prs.slides.add_slide(slide_layout)
     title = slide.shapes.title
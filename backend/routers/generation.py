@@ -1,48 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-import models, schemas, database, auth
-import google.generativeai as genai
+import models, schemas, database, caching, usage, events, profiling
+from json_stream import JSONArrayStream
 import os
 from dotenv import load_dotenv
 from typing import List
 import json
+import threading
 
 # Load environment variables
 load_dotenv()
 
-router = APIRouter(prefix="/generate", tags=["generate"])
+router = APIRouter(prefix="/generate", tags=["generate"], route_class=profiling.ProfiledRoute)
 
-# Initialise Gemini model with fallback handling
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    try:
-        # Preferred model (if available)
-        model = genai.GenerativeModel("gemini-pro-latest")
-        print("DEBUG: Using Gemini model gemini-pro-latest")
-    except Exception as e:
-        print(f"WARN: Preferred model not available: {e}")
-        # Fallback: pick first non‑preview model from list_models()
-        try:
-            available = genai.list_models()
-            viable = [m for m in available if "preview" not in m.name.lower()]
-            if not viable:
-                raise RuntimeError("No suitable Gemini models available")
-            fallback_name = viable[0].name
-            model = genai.GenerativeModel(fallback_name)
-            print(f"DEBUG: Fallback to Gemini model {fallback_name}")
-        except Exception as e2:
-            print(f"ERROR: Unable to obtain a Gemini model: {e2}")
+# Gemini model, created on first use (or warmed up by main.py's lifespan hook).
+# google.generativeai is only imported then, keeping it off the import path.
+model = None
+_model_initialised = False
+_model_lock = threading.Lock()
+
+def init_model():
+    """Configure Gemini and pick a model once per process, with fallback handling."""
+    global model, _model_initialised
+    if _model_initialised:
+        return model
+    with _model_lock:
+        if _model_initialised:
+            return model
+        GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+        if GEMINI_API_KEY:
+            import google.generativeai as genai
+
+            genai.configure(api_key=GEMINI_API_KEY)
+            try:
+                # Preferred model (if available)
+                model = genai.GenerativeModel("gemini-pro-latest")
+                print("DEBUG: Using Gemini model gemini-pro-latest")
+            except Exception as e:
+                print(f"WARN: Preferred model not available: {e}")
+                # Fallback: pick first non‑preview model from list_models()
+                try:
+                    available = genai.list_models()
+                    viable = [m for m in available if "preview" not in m.name.lower()]
+                    if not viable:
+                        raise RuntimeError("No suitable Gemini models available")
+                    fallback_name = viable[0].name
+                    model = genai.GenerativeModel(fallback_name)
+                    print(f"DEBUG: Fallback to Gemini model {fallback_name}")
+                except Exception as e2:
+                    print(f"ERROR: Unable to obtain a Gemini model: {e2}")
+                    model = None
+        else:
             model = None
-else:
-    model = None
-    print("WARNING: GEMINI_API_KEY not found in environment")
+            print("WARNING: GEMINI_API_KEY not found in environment")
+        _model_initialised = True
+    return model
+
+def get_model():
+    if model is not None:
+        return model
+    return init_model()
 
 @router.post("/outline", response_model=List[schemas.Content])
 def generate_outline(
     request: schemas.GenerateOutlineRequest,
+    response: Response,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: models.User = Depends(usage.enforce_token_budget),
 ):
     """Generate an outline for a project using Gemini.
     Returns a list of Content objects that are created in the DB.
@@ -57,22 +82,9 @@ def generate_outline(
 
     # If custom titles are provided, use them directly
     if request.custom_titles:
-        generated_contents = []
-        for i, title in enumerate(request.custom_titles):
-            content = models.Content(
-                project_id=project.id,
-                section_order=i,
-                title=title,
-                content_text="",
-                metadata_props={},
-            )
-            db.add(content)
-            generated_contents.append(content)
-        db.commit()
-        for c in generated_contents:
-            db.refresh(c)
-        return generated_contents
+        return insert_sections(db, project.id, request.custom_titles)
 
+    model = get_model()
     if not model:
         raise HTTPException(status_code=500, detail="Gemini API Key not configured or model unavailable")
 
@@ -85,39 +97,150 @@ def generate_outline(
     if request.num_slides:
         prompt += f" Generate exactly {request.num_slides} items."
 
+    # Titles are parsed as they stream in; malformed items are skipped rather
+    # than failing the whole outline, and a cut-off stream keeps what arrived.
+    parser = JSONArrayStream(strict=False)
+    titles = []
+    error = None
+    stream = None
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        # Remove optional markdown code fences
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.endswith("```"):
-            text = text[:-3]
-        outline = json.loads(text)
-        generated_contents = []
-        for i, title in enumerate(outline):
-            content = models.Content(
-                project_id=project.id,
-                section_order=i,
-                title=title,
-                content_text="",
-                metadata_props={},
-            )
-            db.add(content)
-            generated_contents.append(content)
+        stream = model.generate_content(
+            prompt,
+            stream=True,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        for chunk in stream:
+            titles.extend(parser.feed(chunk.text))
+    except Exception as e:
+        error = e
+    if stream is not None:
+        usage.meter.record(current_user.id, stream)
+    titles.extend(parser.close())
+    titles = [str(t).strip() for t in titles if isinstance(t, (str, int, float)) and str(t).strip()]
+
+    if not titles:
+        detail = str(error) if error else "no outline items in model response"
+        raise HTTPException(status_code=500, detail=f"AI Generation failed: {detail}")
+    if error or parser.errors:
+        print(f"WARN: Partial outline for project {project.id}: kept {len(titles)} items, {parser.errors} malformed, error={error}")
+        response.headers["X-Outline-Partial"] = "true"
+    return insert_sections(db, project.id, titles)
+
+def insert_sections(db: Session, project_id: int, titles: List[str]):
+    """Create empty sections for `titles` with one bulk INSERT ... RETURNING."""
+    rows = [
+        {
+            "project_id": project_id,
+            "section_order": i,
+            "title": title,
+            "content_text": "",
+            "metadata_props": {},
+        }
+        for i, title in enumerate(titles)
+    ]
+    # sort_by_parameter_order keeps RETURNING rows in `titles` order even when
+    # the insert is split into batches
+    inserted = db.scalars(insert(models.Content).returning(models.Content, sort_by_parameter_order=True), rows).all()
+    # Serialize before commit expires the rows, which would reload each one
+    generated_contents = [schemas.Content.model_validate(c) for c in inserted]
+    revision = caching.touch_project(db, project_id)
+    db.commit()
+    events.feed.publish(project_id, "section_created", revision, sections=[c.model_dump(mode="json") for c in generated_contents])
+    return generated_contents
+
+@router.post("/document", response_model=List[schemas.Content])
+def generate_document(
+    request: schemas.GenerateOutlineRequest,
+    response: Response,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(usage.enforce_token_budget),
+):
+    """Generate a whole document (titles and bodies) with a single Gemini call.
+
+    The response is streamed and parsed incrementally; each section is stored
+    as soon as it is complete, so a failure part way keeps what was received;
+    those sections are returned with X-Document-Partial set, like the outline.
+    Use /generate/content to regenerate individual sections afterwards.
+    """
+    project = (
+        db.query(models.Project)
+        .filter(models.Project.id == request.project_id, models.Project.user_id == current_user.id)
+        .first()
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    model = get_model()
+    if not model:
+        raise HTTPException(status_code=500, detail="Gemini API Key not configured or model unavailable")
+
+    unit = "slide" if project.doc_type == "pptx" else "section"
+    prompt = (
+        f"Write a complete {project.doc_type} document about '{request.topic}'. "
+        f"Return ONLY a JSON array of objects, one per {unit}, each with a \"title\" string and a \"content\" string. "
+        "The content should be specific to its section and fit well within the overall document flow. "
+        "Keep it professional and concise. Do not include conversational filler, and do not repeat the title or 'Slide X' inside the content."
+    )
+    if request.custom_titles:
+        prompt += f" Use exactly these titles, in this order: {json.dumps(request.custom_titles)}."
+    elif request.num_slides:
+        prompt += f" Generate exactly {request.num_slides} items."
+
+    last_content = db.query(models.Content).filter(models.Content.project_id == project.id).order_by(models.Content.section_order.desc()).first()
+    next_order = (last_content.section_order + 1) if last_content else 0
+
+    generated_contents = []
+
+    def store_section(section):
+        if not isinstance(section, dict) or not section.get("title"):
+            return
+        content = models.Content(
+            project_id=project.id,
+            section_order=next_order + len(generated_contents),
+            title=str(section["title"]),
+            content_text=str(section.get("content") or ""),
+            metadata_props={},
+        )
+        db.add(content)
+        revision = caching.touch_project(db, project.id)
         db.commit()
-        for c in generated_contents:
-            db.refresh(c)
-        return generated_contents
+        db.refresh(content)
+        generated_contents.append(content)
+        events.feed.publish(project.id, "section_created", revision, sections=[events.section_data(content)])
+
+    parser = JSONArrayStream(strict=False)
+    error = None
+    stream = None
+    try:
+        stream = model.generate_content(
+            prompt,
+            stream=True,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        for chunk in stream:
+            for section in parser.feed(chunk.text):
+                store_section(section)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI Generation failed: {str(e)}")
+        error = e
+    if stream is not None:
+        usage.meter.record(current_user.id, stream)
+    for section in parser.close():
+        store_section(section)
+
+    if not generated_contents:
+        detail = str(error) if error else "no sections in model response"
+        raise HTTPException(status_code=500, detail=f"AI Generation failed: {detail}")
+    if error or parser.errors:
+        print(f"WARN: Partial document for project {project.id}: kept {len(generated_contents)} sections, {parser.errors} malformed, error={error}")
+        response.headers["X-Document-Partial"] = "true"
+    return generated_contents
 
 @router.post("/content")
 def generate_section_content(
     project_id: int,
     content_id: int,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: models.User = Depends(usage.enforce_token_budget),
 ):
     """Generate content for a specific section/slide using Gemini."""
     content = (
@@ -128,6 +251,7 @@ def generate_section_content(
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    model = get_model()
     if not model:
         raise HTTPException(status_code=500, detail="Gemini API Key not configured or model unavailable")
     prompt = (
@@ -140,9 +264,12 @@ def generate_section_content(
     )
     try:
         response = model.generate_content(prompt)
+        usage.meter.record(current_user.id, response)
         content.content_text = response.text
+        revision = caching.touch_project(db, project_id)
         db.commit()
         db.refresh(content)
+        events.feed.publish(project_id, "section_text_updated", revision, content_id=content.id, content_text=content.content_text)
         return content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Generation failed: {str(e)}")
@@ -151,7 +278,7 @@ def generate_section_content(
 def refine_content(
     request: schemas.RefinementRequest,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: models.User = Depends(usage.enforce_token_budget),
 ):
     """Refine existing content using Gemini based on a user prompt."""
     content = db.query(models.Content).filter(models.Content.id == request.content_id).first()
@@ -165,6 +292,7 @@ def refine_content(
     )
     if not project:
         raise HTTPException(status_code=403, detail="Not authorized")
+    model = get_model()
     if not model:
         raise HTTPException(status_code=500, detail="Gemini API Key not configured or model unavailable")
     prompt = (
@@ -175,6 +303,7 @@ def refine_content(
     )
     try:
         response = model.generate_content(prompt)
+        usage.meter.record(current_user.id, response)
         refined_text = response.text
         # Save history
         history = models.RefinementHistory(
@@ -186,8 +315,10 @@ def refine_content(
         db.add(history)
         # Update content
         content.content_text = refined_text
+        revision = caching.touch_project(db, content.project_id)
         db.commit()
         db.refresh(content)
+        events.feed.publish(content.project_id, "section_text_updated", revision, content_id=content.id, content_text=refined_text)
         return content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Refinement failed: {str(e)}")
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+import os
+import models, auth, profiling
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiling"],
+    route_class=profiling.ProfiledRoute,
+)
+
+@router.get("/")
+def list_profiles(current_user: models.User = Depends(auth.get_current_admin)):
+    profiles = []
+    for path in profiling.list_profiles():
+        try:
+            with open(path) as f:
+                summary = f.readline().lstrip("# ").strip()
+            size = os.path.getsize(path)
+        except OSError:
+            # Pruned by save_profile() since it was listed
+            continue
+        profiles.append({
+            "id": os.path.basename(path)[:-len(profiling.PROFILE_SUFFIX)],
+            "summary": summary,
+            "size": size,
+        })
+    return profiles
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, current_user: models.User = Depends(auth.get_current_admin)):
+    path = profiling.profile_path(profile_id)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # Collapsed stacks can be dropped straight into https://www.speedscope.app
+    return FileResponse(path, filename=f"{profile_id}.collapsed.txt", media_type="text/plain")
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import models, schemas, database, auth
+import asyncio
+import models, schemas, database, auth, caching, events, profiling
 
 router = APIRouter(
     prefix="/projects",
     tags=["projects"],
+    route_class=profiling.ProfiledRoute,
 )
 
 @router.post("/", response_model=schemas.Project)
@@ -17,15 +20,26 @@ def create_project(project: schemas.ProjectCreate, db: Session = Depends(databas
     return db_project
 
 @router.get("/", response_model=list[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
-    projects = db.query(models.Project).filter(models.Project.user_id == current_user.id).offset(skip).limit(limit).all()
-    return projects
+def read_projects(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    # Cheap (id, revision) query first; contents are only loaded when something changed
+    query = db.query(models.Project).filter(models.Project.user_id == current_user.id).order_by(models.Project.id).offset(skip).limit(limit)
+    revisions = query.with_entities(models.Project.id, models.Project.revision).all()
+    etag = caching.project_list_etag((r.id, r.revision) for r in revisions)
+    if caching.is_not_modified(request, etag):
+        return caching.not_modified_response(etag)
+    caching.set_cache_headers(response, etag)
+    return query.all()
 
 @router.get("/{project_id}", response_model=schemas.Project)
-def read_project(project_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.user_id == current_user.id).first()
-    if project is None:
+def read_project(project_id: int, request: Request, response: Response, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    revision = db.query(models.Project.revision).filter(models.Project.id == project_id, models.Project.user_id == current_user.id).scalar()
+    if revision is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    etag = caching.project_etag(project_id, revision)
+    if caching.is_not_modified(request, etag):
+        return caching.not_modified_response(etag)
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    caching.set_cache_headers(response, caching.project_etag(project_id, project.revision))
     return project
 
 @router.delete("/{project_id}")
@@ -35,6 +49,7 @@ def delete_project(project_id: int, db: Session = Depends(database.get_db), curr
         raise HTTPException(status_code=404, detail="Project not found")
     db.delete(project)
     db.commit()
+    events.feed.publish(project_id, "project_deleted")
     return {"ok": True}
 
 @router.put("/{project_id}/reorder")
@@ -56,7 +71,10 @@ def reorder_project_content(
         if content_id in content_map:
             content_map[content_id].section_order = i
             
+    ordered_ids = sorted(content_map, key=lambda content_id: content_map[content_id].section_order)
+    revision = caching.touch_project(db, project_id)
     db.commit()
+    events.feed.publish(project_id, "section_reordered", revision, ordered_content_ids=ordered_ids)
     return {"ok": True}
 
 @router.post("/{project_id}/content", response_model=schemas.Content)
@@ -82,8 +100,10 @@ def create_project_content(
         metadata_props=content.metadata_props
     )
     db.add(db_content)
+    revision = caching.touch_project(db, project_id)
     db.commit()
     db.refresh(db_content)
+    events.feed.publish(project_id, "section_created", revision, sections=[events.section_data(db_content)])
     return db_content
 
 @router.delete("/{project_id}/content/{content_id}")
@@ -102,7 +122,9 @@ def delete_project_content(
         raise HTTPException(status_code=404, detail="Content not found")
         
     db.delete(content)
+    revision = caching.touch_project(db, project_id)
     db.commit()
+    events.feed.publish(project_id, "section_deleted", revision, content_id=content_id)
     return {"ok": True}
 
 @router.post("/{project_id}/content/{content_id}/feedback")
@@ -112,7 +134,9 @@ def update_content_feedback(project_id: int, content_id: int, feedback_req: sche
         raise HTTPException(status_code=404, detail="Content not found")
     
     content.feedback = feedback_req.feedback
+    revision = caching.touch_project(db, project_id)
     db.commit()
+    events.feed.publish(project_id, "section_updated", revision, content_id=content_id, feedback=feedback_req.feedback)
     return {"ok": True}
 
 @router.post("/{project_id}/content/{content_id}/notes")
@@ -122,5 +146,89 @@ def update_content_notes(project_id: int, content_id: int, notes_req: schemas.No
         raise HTTPException(status_code=404, detail="Content not found")
     
     content.user_notes = notes_req.notes
+    revision = caching.touch_project(db, project_id)
     db.commit()
+    events.feed.publish(project_id, "section_updated", revision, content_id=content_id, user_notes=notes_req.notes)
     return {"ok": True}
+
+# Seconds a change feed client has to send its token after connecting
+FEED_AUTH_TIMEOUT = 10
+
+def _authorize_feed(project_id: int, token: str):
+    """Token check for the change feed: does the token's user own the project?"""
+    try:
+        uid = auth.verify_token(token)["uid"]
+    except Exception:
+        return False
+    db = database.SessionLocal()
+    try:
+        return db.query(
+            db.query(models.Project)
+            .join(models.User, models.User.id == models.Project.user_id)
+            .filter(models.Project.id == project_id, models.User.firebase_uid == uid)
+            .exists()
+        ).scalar()
+    finally:
+        db.close()
+
+def _project_revision(project_id: int):
+    db = database.SessionLocal()
+    try:
+        return db.query(models.Project.revision).filter(models.Project.id == project_id).scalar()
+    finally:
+        db.close()
+
+@router.websocket("/{project_id}/changes")
+async def project_changes(websocket: WebSocket, project_id: int):
+    """Push change events for a project (section created/deleted/reordered/updated).
+
+    Browsers can't set headers on WebSockets, and a token in the URL would end
+    up in access logs, so the client's first message must be its Firebase ID
+    token: {"token": "..."}. The server then sends {"type": "snapshot",
+    "revision": N}. After that, each event carries the project revision it
+    produced; a gap, a "resync" or a "truncated" event means the client should
+    refetch the project.
+    """
+    subscription = None
+    try:
+        await websocket.accept()
+        try:
+            message = await asyncio.wait_for(websocket.receive_json(), FEED_AUTH_TIMEOUT)
+            token = message.get("token", "") if isinstance(message, dict) else ""
+        except (asyncio.TimeoutError, ValueError):
+            token = ""
+        if not token or not await run_in_threadpool(_authorize_feed, project_id, token):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        # Subscribe before reading the revision so no event falls in between
+        subscription = events.feed.subscribe(project_id)
+        revision = await run_in_threadpool(_project_revision, project_id)
+        if revision is None:
+            # Deleted since the ownership check
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        await websocket.send_json({"type": "snapshot", "project_id": project_id, "revision": revision})
+        # Watch the socket alongside the queue to notice disconnects while idle
+        receiver = asyncio.create_task(websocket.receive_text())
+        try:
+            while True:
+                getter = asyncio.create_task(subscription.queue.get())
+                done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    receiver.result()  # raises WebSocketDisconnect once the client is gone
+                    receiver = asyncio.create_task(websocket.receive_text())
+                if getter not in done:
+                    getter.cancel()
+                    continue
+                event = getter.result()
+                await websocket.send_json(event)
+                if event["type"] == "project_deleted":
+                    await websocket.close()
+                    break
+        finally:
+            receiver.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if subscription is not None:
+            events.feed.unsubscribe(subscription)
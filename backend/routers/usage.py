@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import timedelta
+import models, database, auth, usage, profiling
+
+router = APIRouter(
+    prefix="/usage",
+    tags=["usage"],
+    route_class=profiling.ProfiledRoute,
+)
+
+@router.get("/")
+def read_usage(days: int = 30, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    """Token usage for the current user: today's total against the budget, plus daily history."""
+    today = usage.today()
+    rows = (
+        db.query(
+            models.LLMUsage.day,
+            func.sum(models.LLMUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(models.LLMUsage.completion_tokens).label("completion_tokens"),
+            func.sum(models.LLMUsage.calls).label("calls"),
+        )
+        .filter(models.LLMUsage.user_id == current_user.id, models.LLMUsage.day > today - timedelta(days=days))
+        .group_by(models.LLMUsage.day)
+        .order_by(models.LLMUsage.day)
+        .all()
+    )
+    tokens_used = usage.meter.tokens_used(db, current_user.id, today)
+    budget = usage.DAILY_TOKEN_BUDGET or None
+    return {
+        "day": today,
+        "tokens_used": tokens_used,
+        "daily_budget": budget,
+        "remaining": max(budget - tokens_used, 0) if budget else None,
+        "history": [
+            {
+                "day": row.day,
+                "prompt_tokens": row.prompt_tokens,
+                "completion_tokens": row.completion_tokens,
+                "calls": row.calls,
+            }
+            for row in rows
+        ],
+    }
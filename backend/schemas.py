@@ -26,6 +26,8 @@ class Project(ProjectBase):
     id: int
     user_id: int
     created_at: datetime
+    revision: int = 1
+    updated_at: Optional[datetime] = None
     contents: List["Content"] = []
     class Config:
         from_attributes = True
@@ -0,0 +1,113 @@
+import json
+import random
+
+import pytest
+
+from json_stream import JSONArrayStream
+
+
+def feed_all(stream, text, chunk_size=None):
+    """Feed `text` in chunks (random sizes by default) and close the stream."""
+    rng = random.Random(0)
+    items = []
+    i = 0
+    while i < len(text):
+        size = chunk_size or rng.randint(1, 12)
+        items.extend(stream.feed(text[i:i + size]))
+        i += size
+    return items + stream.close()
+
+
+def test_plain_array():
+    stream = JSONArrayStream()
+    assert feed_all(stream, '["Intro", "Market", "Outlook"]') == ["Intro", "Market", "Outlook"]
+    assert stream.done
+    assert stream.errors == 0
+
+
+def test_empty_array():
+    stream = JSONArrayStream()
+    assert feed_all(stream, "[]") == []
+    assert stream.done
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64])
+def test_elements_split_across_chunks(chunk_size):
+    data = [{"title": f"Section {i}", "content": "x" * 50} for i in range(10)]
+    stream = JSONArrayStream()
+    assert feed_all(stream, json.dumps(data), chunk_size=chunk_size) == data
+
+
+def test_elements_returned_as_soon_as_complete():
+    stream = JSONArrayStream()
+    assert stream.feed('["Intro", "Mar') == ["Intro"]
+    assert stream.feed('ket", ') == ["Market"]
+    assert stream.feed('"Outlook"]') == ["Outlook"]
+
+
+def test_code_fences_and_prose_are_ignored():
+    text = 'Sure! Here is the outline:\n```json\n["Intro", "Scope"]\n```'
+    assert feed_all(JSONArrayStream(), text) == ["Intro", "Scope"]
+
+
+def test_escaped_quotes_and_brackets_inside_strings():
+    data = ['Say \\"hi\\"', "a, b]", "{not an object}", "back\\\\slash"]
+    text = "[" + ", ".join(f'"{item}"' for item in data) + "]"
+    assert feed_all(JSONArrayStream(), text) == json.loads(text)
+
+
+def test_nested_values():
+    data = [{"title": "A", "bullets": ["x", "y", {"z": [1, 2]}]}, [1, [2, [3]]], None, True, 4.5]
+    assert feed_all(JSONArrayStream(), json.dumps(data)) == data
+
+
+def test_text_after_closing_bracket_is_ignored():
+    stream = JSONArrayStream()
+    assert feed_all(stream, '["A"] and some trailing chatter ["B"]') == ["A"]
+
+
+def test_strict_mode_raises_on_malformed_element():
+    with pytest.raises(ValueError):
+        feed_all(JSONArrayStream(), '["A", {"bad": }, "C"]')
+
+
+def test_tolerant_skips_malformed_element():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '["A", {"bad": }, "C"]') == ["A", "C"]
+    assert stream.errors == 1
+
+
+def test_tolerant_salvages_value_before_stray_token():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '["Intro" x, "Scope"]') == ["Intro", "Scope"]
+    assert stream.errors == 1
+
+
+def test_tolerant_counts_salvage_that_drops_data():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '["a" "b", "c"]') == ["a", "c"]
+    assert stream.errors == 1
+
+
+def test_tolerant_keeps_bare_text():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '[Introduction, "Scope"]') == ["Introduction", "Scope"]
+    assert stream.errors == 1
+
+
+def test_truncated_stream_keeps_complete_last_element():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '["A", "B"') == ["A", "B"]
+    assert stream.errors == 0
+
+
+def test_truncated_stream_drops_unterminated_element():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, '["A", "B", "Conc') == ["A", "B"]
+    assert stream.errors == 1
+
+
+def test_no_array_at_all():
+    stream = JSONArrayStream(strict=False)
+    assert feed_all(stream, "I cannot help with that.") == []
+    assert not stream._started
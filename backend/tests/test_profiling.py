@@ -0,0 +1,65 @@
+import os
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import profiling
+
+
+def busy_endpoint():
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        pass
+    return {"ok": True}
+
+
+def make_app():
+    router = APIRouter(prefix="/work", route_class=profiling.ProfiledRoute)
+    router.add_api_route("/", busy_endpoint)
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+    app.include_router(router)
+    return app
+
+
+def test_profile_contains_sync_endpoint_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    with TestClient(make_app()) as client:
+        response = client.get("/work/")
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    with open(profiling.profile_path(profile_id)) as f:
+        header, *stacks = f.read().splitlines()
+    assert header.startswith("# GET /work/ ")
+    assert stacks
+    # Stacks are rooted at the endpoint, which runs in the threadpool
+    assert all(line.startswith("busy_endpoint (test_profiling.py:") for line in stacks)
+
+
+def test_unprofiled_request_has_no_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    with TestClient(make_app()) as client:
+        response = client.get("/work/")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_list_profiles_skips_pruned_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    kept = tmp_path / ("a" * 32 + profiling.PROFILE_SUFFIX)
+    pruned = tmp_path / ("b" * 32 + profiling.PROFILE_SUFFIX)
+    kept.write_text("# GET / 1.0ms\n")
+    pruned.write_text("# GET / 1.0ms\n")
+    getmtime = os.path.getmtime
+
+    def racing_getmtime(path):
+        if path == str(pruned):
+            os.remove(path)
+        return getmtime(path)
+
+    monkeypatch.setattr(os.path, "getmtime", racing_getmtime)
+    assert profiling.list_profiles() == [str(kept)]
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+import models, database, auth
+
+# Per-user daily token budget across all Gemini calls (0 disables the quota)
+DAILY_TOKEN_BUDGET = int(os.getenv("USAGE_DAILY_TOKEN_BUDGET", "0"))
+# How often metered usage is written to the llm_usage table
+FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "10"))
+# How long a worker trusts its cached copy of the stored daily totals. Other
+# workers' usage only becomes visible after their flush and this refresh.
+TOTALS_TTL = float(os.getenv("USAGE_TOTALS_TTL", "60"))
+
+
+def today():
+    return datetime.now(timezone.utc).date()
+
+
+class UsageMeter:
+    """Aggregates token usage in memory and writes it out in batches.
+
+    record() is called after every model call and only touches a dict under a
+    lock; flush() turns everything pending into a single bulk INSERT.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (user_id, day) -> [prompt_tokens, completion_tokens, calls]
+        self._stored = {}  # (user_id, day) -> (tokens already in the DB, fetched_at)
+        self._inflight = {}  # batch being written by flush(), same shape as _pending
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, user_id, response):
+        try:
+            usage = response.usage_metadata
+        except Exception:
+            # e.g. a stream that failed before its final chunk
+            usage = None
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        if not prompt_tokens and not completion_tokens:
+            # Gemini still bills for what it generated, but we can't see it
+            print(f"WARN: Model call for user {user_id} reported no token usage; it is not counted against the budget")
+        with self._lock:
+            totals = self._pending.setdefault((user_id, today()), [0, 0, 0])
+            totals[0] += prompt_tokens
+            totals[1] += completion_tokens
+            totals[2] += 1
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Still counted by tokens_used() until _stored includes it
+            self._inflight = pending
+            # Cached totals for past days are never read again
+            current_day = today()
+            for key in [key for key in self._stored if key[1] < current_day]:
+                del self._stored[key]
+        if not pending:
+            return
+        rows = [
+            {
+                "user_id": user_id,
+                "day": day,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "calls": calls,
+            }
+            for (user_id, day), (prompt_tokens, completion_tokens, calls) in pending.items()
+        ]
+        flush_started = time.monotonic()
+        db = database.SessionLocal()
+        try:
+            db.execute(insert(models.LLMUsage), rows)
+            db.commit()
+        except Exception as e:
+            print(f"ERROR: Failed to flush LLM usage, retrying next interval: {e}")
+            db.rollback()
+            with self._lock:
+                self._inflight = {}
+                for key, (prompt_tokens, completion_tokens, calls) in pending.items():
+                    totals = self._pending.setdefault(key, [0, 0, 0])
+                    totals[0] += prompt_tokens
+                    totals[1] += completion_tokens
+                    totals[2] += calls
+            return
+        finally:
+            db.close()
+        # Cached totals read before this insert don't include it yet
+        with self._lock:
+            self._inflight = {}
+            for key, (prompt_tokens, completion_tokens, _) in pending.items():
+                if key in self._stored:
+                    stored, fetched_at = self._stored[key]
+                    if fetched_at <= flush_started:
+                        self._stored[key] = (stored + prompt_tokens + completion_tokens, fetched_at)
+
+    def tokens_used(self, db, user_id, day=None):
+        """Tokens used by `user_id` on `day`: stored totals plus unflushed and in-flight usage."""
+        day = day or today()
+        key = (user_id, day)
+        with self._lock:
+            cached = self._stored.get(key)
+        if cached is None or time.monotonic() - cached[1] > TOTALS_TTL:
+            stored = (
+                db.query(func.coalesce(func.sum(models.LLMUsage.prompt_tokens + models.LLMUsage.completion_tokens), 0))
+                .filter(models.LLMUsage.user_id == user_id, models.LLMUsage.day == day)
+                .scalar()
+            )
+            cached = (stored, time.monotonic())
+            with self._lock:
+                self._stored[key] = cached
+        with self._lock:
+            pending = self._pending.get(key, [0, 0, 0])
+            inflight = self._inflight.get(key, [0, 0, 0])
+            return cached[0] + pending[0] + pending[1] + inflight[0] + inflight[1]
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+
+meter = UsageMeter()
+
+
+def enforce_token_budget(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    """Reject model calls once the user has spent their daily token budget."""
+    if DAILY_TOKEN_BUDGET and meter.tokens_used(db, current_user.id) >= DAILY_TOKEN_BUDGET:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Daily AI token budget exhausted. Try again tomorrow.",
+        )
+    return current_user
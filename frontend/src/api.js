@@ -46,6 +46,17 @@ export const generateOutline = async (projectId, topic, options = {}) => {
     return response.data;
 };
 
+// Single model call that writes every section; sections are stored as they stream in
+export const generateDocument = async (projectId, topic, options = {}) => {
+    const response = await api.post('/generate/document', {
+        project_id: projectId,
+        topic,
+        num_slides: options.numSlides,
+        custom_titles: options.customTitles
+    });
+    return response.data;
+};
+
 export const generateContent = async (projectId, contentId) => {
     const response = await api.post(`/generate/content?project_id=${projectId}&content_id=${contentId}`);
     return response.data;
@@ -80,6 +91,82 @@ export const updateNotes = async (projectId, contentId, notes) => {
     return response.data;
 };
 
+export const getUsage = async () => {
+    const response = await api.get('/usage/');
+    return response.data;
+};
+
+// Opens the project's change feed and keeps it open, reconnecting with
+// backoff; returns a function that closes it. After each reconnect the server
+// sends a fresh snapshot, whose revision tells the caller whether it missed events.
+export const subscribeToProject = (projectId, onEvent) => {
+    let socket = null;
+    let closed = false;
+    let retryDelay = 1000;
+    let retryTimer = null;
+    // Set after a policy-violation close: retry once with a fresh ID token
+    let refreshToken = false;
+
+    const scheduleReconnect = () => {
+        if (closed) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+    };
+
+    const connect = async () => {
+        retryTimer = null;
+        const user = auth.currentUser;
+        if (closed) return;
+        if (!user) {
+            scheduleReconnect();
+            return;
+        }
+        let token;
+        try {
+            token = await user.getIdToken(refreshToken);
+        } catch {
+            scheduleReconnect();
+            return;
+        }
+        if (closed) return;
+        const wsUrl = API_URL.replace(/^http/, 'ws');
+        // The token goes in the first message, never in the URL, so it stays out of server logs
+        socket = new WebSocket(`${wsUrl}/projects/${projectId}/changes`);
+        socket.onopen = () => socket.send(JSON.stringify({ token }));
+        socket.onmessage = (message) => {
+            const event = JSON.parse(message.data);
+            if (event.type === 'snapshot') {
+                retryDelay = 1000;
+                refreshToken = false;
+            }
+            if (event.type === 'project_deleted') closed = true;
+            onEvent(event);
+        };
+        socket.onerror = () => socket && socket.close();
+        socket.onclose = (event) => {
+            socket = null;
+            if (event.code === 1008) {
+                // Rejected token or project: an expired token gets one retry, then give up
+                if (refreshToken) {
+                    closed = true;
+                    return;
+                }
+                refreshToken = true;
+                connect();
+                return;
+            }
+            scheduleReconnect();
+        };
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        if (retryTimer) clearTimeout(retryTimer);
+        if (socket) socket.close();
+    };
+};
+
 export const exportDocument = async (projectId, title, docType) => {
     const response = await api.get(`/export/${projectId}`, {
         responseType: 'blob',
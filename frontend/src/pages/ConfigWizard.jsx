@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { createProject, generateOutline } from '../api';
+import { createProject, generateOutline, generateDocument } from '../api';
 import Layout from '../components/Layout';
 import { FileText, Presentation, Loader } from 'lucide-react';
 
@@ -10,6 +10,7 @@ const ConfigWizard = () => {
     const [title, setTitle] = useState('');
     const [numSlides, setNumSlides] = useState('');
     const [customTitles, setCustomTitles] = useState('');
+    const [writeDraft, setWriteDraft] = useState(false);
     const [loading, setLoading] = useState(false);
     const navigate = useNavigate();
 
@@ -20,9 +21,10 @@ const ConfigWizard = () => {
             // 1. Create Project
             const project = await createProject(title, docType);
 
-            // 2. Generate Outline (Optional but good for UX)
+            // 2. Generate Outline, or the whole draft in one pass
             const titlesArray = customTitles.split('\n').map(t => t.trim()).filter(t => t);
-            await generateOutline(project.id, title, {
+            const generate = writeDraft ? generateDocument : generateOutline;
+            await generate(project.id, title, {
                 numSlides: numSlides ? parseInt(numSlides) : null,
                 customTitles: titlesArray.length > 0 ? titlesArray : null
             });
@@ -150,6 +152,19 @@ const ConfigWizard = () => {
                             </div>
                         )}
 
+                        <label className="flex items-start space-x-3">
+                            <input
+                                type="checkbox"
+                                className="mt-1 h-4 w-4 text-indigo-600 border-gray-300 rounded"
+                                checked={writeDraft}
+                                onChange={(e) => setWriteDraft(e.target.checked)}
+                            />
+                            <span className="text-sm text-gray-700">
+                                Write the full draft now
+                                <span className="block text-xs text-gray-500">Generates every section in one pass instead of just the outline.</span>
+                            </span>
+                        </label>
+
                         <div className="flex space-x-4">
                             <button
                                 onClick={() => setStep(2)}
@@ -1,17 +1,27 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { getProjects, deleteProject } from '../api';
+import { getProjects, deleteProject, getUsage } from '../api';
 import Layout from '../components/Layout';
 import { Plus, FileText, Presentation, Trash2 } from 'lucide-react';
 
 const Dashboard = () => {
     const [projects, setProjects] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [usage, setUsage] = useState(null);
 
     useEffect(() => {
         fetchProjects();
+        fetchUsage();
     }, []);
 
+    const fetchUsage = async () => {
+        try {
+            setUsage(await getUsage());
+        } catch (error) {
+            console.error('Failed to fetch usage', error);
+        }
+    };
+
     const fetchProjects = async () => {
         try {
             const data = await getProjects();
@@ -44,7 +54,15 @@ const Dashboard = () => {
         <Layout>
             <div className="px-4 sm:px-0">
                 <div className="flex justify-between items-center mb-6">
-                    <h1 className="text-2xl font-semibold text-gray-900">My Projects</h1>
+                    <div>
+                        <h1 className="text-2xl font-semibold text-gray-900">My Projects</h1>
+                        {usage && (
+                            <p className="text-sm text-gray-500 mt-1">
+                                AI tokens used today: {usage.tokens_used.toLocaleString()}
+                                {usage.daily_budget && ` of ${usage.daily_budget.toLocaleString()}`}
+                            </p>
+                        )}
+                    </div>
                     <Link
                         to="/create"
                         className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md shadow-sm text-white bg-indigo-600 hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500"
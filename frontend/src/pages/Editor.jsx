@@ -1,6 +1,6 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useParams } from 'react-router-dom';
-import { getProject, generateContent, refineContent, exportDocument, createContent, deleteContent, updateFeedback, updateNotes } from '../api';
+import { getProject, subscribeToProject, generateContent, refineContent, exportDocument, createContent, deleteContent, updateFeedback, updateNotes } from '../api';
 import Layout from '../components/Layout';
 import { Save, Download, RefreshCw, MessageSquare, ThumbsUp, ThumbsDown, GripVertical, Trash2, Plus } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
@@ -19,16 +19,73 @@ const Editor = () => {
     const [notesOpen, setNotesOpen] = useState({});
     const [notesText, setNotesText] = useState({});
 
+    const revisionRef = useRef(null);
+
     useEffect(() => {
         fetchProject();
     }, [id]);
 
+    // Apply change events pushed by the backend (other tabs, background generation)
+    useEffect(() => {
+        return subscribeToProject(id, (event) => {
+            if (event.type === 'snapshot') {
+                if (revisionRef.current !== null && event.revision !== revisionRef.current) fetchProject();
+                revisionRef.current = event.revision;
+                return;
+            }
+            if (event.type === 'project_deleted') {
+                setProject(null);
+                return;
+            }
+            const missedEvents = revisionRef.current !== null && event.revision !== revisionRef.current + 1;
+            revisionRef.current = event.revision ?? revisionRef.current;
+            if (event.type === 'resync' || event.truncated || missedEvents) {
+                fetchProject();
+                return;
+            }
+            setProject(prev => {
+                if (!prev) return prev;
+                let contents = prev.contents;
+                switch (event.type) {
+                    case 'section_created': {
+                        const known = new Set(contents.map(c => c.id));
+                        contents = [...contents, ...event.sections.filter(c => !known.has(c.id))];
+                        break;
+                    }
+                    case 'section_deleted':
+                        contents = contents.filter(c => c.id !== event.content_id);
+                        break;
+                    case 'section_reordered': {
+                        const order = new Map(event.ordered_content_ids.map((contentId, index) => [contentId, index]));
+                        contents = contents.map(c => order.has(c.id) ? { ...c, section_order: order.get(c.id) } : c);
+                        break;
+                    }
+                    case 'section_text_updated':
+                        contents = contents.map(c => c.id === event.content_id ? { ...c, content_text: event.content_text } : c);
+                        break;
+                    case 'section_updated': {
+                        const fields = Object.fromEntries(
+                            Object.entries(event).filter(([key]) => key === 'feedback' || key === 'user_notes')
+                        );
+                        contents = contents.map(c => c.id === event.content_id ? { ...c, ...fields } : c);
+                        break;
+                    }
+                    default:
+                        return prev;
+                }
+                contents = [...contents].sort((a, b) => a.section_order - b.section_order);
+                return { ...prev, revision: event.revision, contents };
+            });
+        });
+    }, [id]);
+
     const fetchProject = async () => {
         try {
             const data = await getProject(id);
             if (data.contents) {
                 data.contents.sort((a, b) => a.section_order - b.section_order);
             }
+            revisionRef.current = data.revision ?? revisionRef.current;
             setProject(data);
         } catch (error) {
             console.error('Failed to fetch project', error);
@@ -87,7 +144,8 @@ const Editor = () => {
             const newContent = await createContent(id, newSectionTitle);
             setProject(prev => ({
                 ...prev,
-                contents: [...prev.contents, newContent]
+                // The change feed may have delivered it already
+                contents: [...prev.contents.filter(c => c.id !== newContent.id), newContent]
             }));
             setNewSectionTitle('');
         } catch (error) {